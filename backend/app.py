@@ -1,29 +1,205 @@
-from flask import Flask, render_template, request, send_file, jsonify
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import letter
+from flask import (Flask, Request, render_template, request, send_file, jsonify, stream_with_context, url_for, g,
+                   send_from_directory, abort)
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+import cProfile
 import io
 import json # Keep this import for the generate_resume_pdf route
+import mimetypes
 import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+
+import assets
+import metrics
+from drafts import DraftNotFound, DraftStore, VersionConflict
+
+from pdf_batch import (PDF_BATCH_WORKERS, ZipStreamWriter, iter_json_array, iter_ndjson,
+                       reset_render_pool, submit_render, zip_entry)
+from pdf_cache import PDF_LAYOUT_VERSION, PdfCache, resume_cache_key
+from pdf_jobs import PdfJobQueue, QueueFull
+
+# Input limits, checked before any parsing or rendering so oversized resumes cannot blow up a worker's memory
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 4 * 1024 * 1024))
+MAX_BATCH_REQUEST_BYTES = int(os.environ.get('MAX_BATCH_REQUEST_BYTES', 256 * 1024 * 1024))
+MAX_FIELD_CHARS = int(os.environ.get('MAX_FIELD_CHARS', 500_000))
+# Rendered PDFs up to this size stay in memory (and in the PDF cache); larger ones spill to a temp file
+PDF_SPOOL_MAX_BYTES = int(os.environ.get('PDF_SPOOL_MAX_BYTES', 4 * 1024 * 1024))
+
+class ResumeRequest(Request):
+    # Form fields are checked against MAX_FIELD_CHARS after parsing; this only caps the parser's buffer
+    max_form_memory_size = MAX_REQUEST_BYTES
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'generate_resume_pdfs':
+            return MAX_BATCH_REQUEST_BYTES
+        return MAX_REQUEST_BYTES
 
 app = Flask(__name__,
             template_folder='../frontend/templates',
             static_folder='../frontend/static')
+app.request_class = ResumeRequest
+
+# Compiled templates are kept on disk, so new workers load bytecode instead of parsing and compiling Jinja again
+# Without JINJA_CACHE_DIR, Jinja picks a private per-user directory and checks its owner and permissions
+JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR') or None
+if JINJA_CACHE_DIR:
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+RESUME_FIELDS = ('name', 'email', 'phone', 'linkedin', 'summary', 'skills', 'education', 'experience', 'reference')
+
+# Rendered PDFs are cached by a hash of their inputs; set PDF_CACHE_DIR to also keep them on disk
+pdf_cache = PdfCache(max_bytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+                     disk_dir=os.environ.get('PDF_CACHE_DIR') or None,
+                     disk_max_bytes=int(os.environ.get('PDF_CACHE_DIR_MAX_BYTES', 256 * 1024 * 1024)))
+
+# Saved resume drafts, so pages and PDFs can be requested by id instead of re-posting the whole resume
+drafts = DraftStore(os.environ.get('DRAFTS_DB') or os.path.join(app.instance_path, 'drafts.sqlite3'),
+                    fields=RESUME_FIELDS,
+                    pool_size=int(os.environ.get('DRAFTS_POOL_SIZE', 4)),
+                    ttl_seconds=int(os.environ.get('DRAFTS_TTL', 30 * 24 * 3600)))
+
+# Asynchronous render jobs; resume_display.js polls them instead of waiting on a request when enabled
+app.config['PDF_JOBS_ENABLED'] = os.environ.get('PDF_JOBS_ENABLED', '0') == '1'
+PDF_JOB_RETRY_AFTER = int(os.environ.get('PDF_JOB_RETRY_AFTER', 2))
+pdf_jobs = PdfJobQueue(job_dir=os.environ.get('PDF_JOB_DIR') or os.path.join(app.instance_path, 'pdf_jobs'),
+                       submit_render=submit_render,
+                       max_queue=int(os.environ.get('PDF_JOB_MAX_QUEUE', 32)),
+                       ttl_seconds=int(os.environ.get('PDF_JOB_TTL', 600)),
+                       on_rendered=pdf_cache.put)
+
+# Requests slower than this are logged with their payload sizes (0 disables the log)
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', 2.0))
+# Opt-in: profile this fraction of requests with cProfile and write the stats to PROFILE_DIR
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+
+# Fingerprinted static assets; build them with `python backend/assets.py` or at startup
+if os.environ.get('BUILD_ASSETS_ON_STARTUP', '0') == '1':
+    asset_manifest = assets.build_assets()
+else:
+    asset_manifest = assets.load_manifest()
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+metrics.describe_histogram('http_request_duration_seconds', "Time to produce a response, by endpoint.")
+metrics.describe_histogram('resume_pdf_stage_seconds', "Time spent in each stage of PDF generation.")
+metrics.describe_histogram('resume_html_stage_seconds', "Time spent in each stage of resume page rendering.")
+metrics.describe_counter('pdf_cache_lookups_total', "Rendered PDF cache lookups, by result.")
+
+@app.template_global()
+def asset_url(endpoint, **values):
+    """Drop-in for url_for that points static files at their fingerprinted build when one exists."""
+    if endpoint == 'static':
+        hashed = asset_manifest['files'].get(values.get('filename'))
+        if hashed:
+            values['filename'] = hashed
+            return url_for('hashed_asset', **values)
+    return url_for(endpoint, **values)
+
+@app.template_global()
+def asset_srcset(filename, mimetype='image/webp'):
+    """srcset attribute value listing the resized variants of an image in one format."""
+    variants = asset_manifest['variants'].get(filename, [])
+    return ', '.join(f"{url_for('hashed_asset', filename=v['path'])} {v['width']}w"
+                     for v in variants if v['type'] == mimetype)
+
+@app.route('/assets/<path:filename>')
+def hashed_asset(filename):
+    # Only built files are served here; their names change with their content, so they never go stale
+    if filename.endswith(('.gz', '.br')) or filename == 'manifest.json':
+        abort(404)
+    response = None
+    if filename.endswith(assets.COMPRESSIBLE_EXTENSIONS):
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[encoding] and os.path.isfile(os.path.join(assets.BUILD_DIR, filename + suffix)):
+                response = send_from_directory(assets.BUILD_DIR, filename + suffix, max_age=ASSET_MAX_AGE,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(assets.BUILD_DIR, filename, max_age=ASSET_MAX_AGE)
+        response.vary.add('Accept-Encoding')
+    else:
+        response = send_from_directory(assets.BUILD_DIR, filename, max_age=ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    return response
+
+@app.before_request
+def reject_oversized_request():
+    # Werkzeug enforces the limit when the body is read; refuse a declared oversized body before any work
+    if request.content_length is not None and request.content_length > request.max_content_length:
+        raise RequestEntityTooLarge()
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"error": e.description}), 413
+
+def check_field_sizes(data):
+    """Raise 413 if any resume field in `data` is longer than MAX_FIELD_CHARS."""
+    for field in RESUME_FIELDS:
+        value = data.get(field)
+        if isinstance(value, str) and len(value) > MAX_FIELD_CHARS:
+            raise RequestEntityTooLarge(f"Field '{field}' is longer than {MAX_FIELD_CHARS} characters.")
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
 
-# Define custom styles for the PDF
-styles = getSampleStyleSheet()
-styles.add(ParagraphStyle(name='Heading1Centered', parent=styles['h1'], alignment=TA_CENTER, fontSize=24, spaceAfter=14))
-styles.add(ParagraphStyle(name='SectionHeading', parent=styles['h2'], fontSize=16, spaceAfter=10, spaceBefore=12, leading=18))
-styles.add(ParagraphStyle(name='Subheading', parent=styles['h3'], fontSize=12, leading=14, spaceAfter=4, spaceBefore=4))
-styles.add(ParagraphStyle(name='DateLocation', parent=styles['Normal'], fontSize=9, alignment=TA_RIGHT, spaceAfter=0))
-styles.add(ParagraphStyle(name='ListItem', parent=styles['Normal'], fontSize=10, leading=12, leftIndent=0.2 * inch, bulletIndent=0.1 * inch, spaceAfter=3, bulletText='\u2022'))
+@app.after_request
+def record_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{request.endpoint}-{time.time():.3f}-{os.getpid()}.prof"))
 
+    start = g.pop('request_start', None)
+    if start is None:
+        return response
+    duration = time.perf_counter() - start
+    metrics.observe('http_request_duration_seconds', duration,
+                    endpoint=request.endpoint or 'unknown', method=request.method, status=response.status_code)
+    if SLOW_REQUEST_SECONDS and duration >= SLOW_REQUEST_SECONDS:
+        app.logger.warning(f"Slow request: {request.method} {request.path} -> {response.status_code} "
+                           f"in {duration:.3f}s, request {request.content_length or 0} bytes, "
+                           f"field sizes {payload_field_sizes()}, response {response.content_length} bytes")
+    return response
+
+def payload_field_sizes():
+    """Character count of each resume field in the current request, for the slow request log."""
+    if request.is_json:
+        data = request.get_json(silent=True)
+    else:
+        data = request.form
+    if not isinstance(data, dict):
+        return {}
+    return {key: len(value) for key, value in data.items() if isinstance(value, str)}
+
+def cached_pdf(cache_key):
+    pdf_bytes = pdf_cache.get(cache_key)
+    metrics.inc('pdf_cache_lookups_total', result='miss' if pdf_bytes is None else 'hit')
+    return pdf_bytes
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    # ?draft=<id> reopens a saved draft in the form for editing
+    draft = drafts.get(request.args['draft']) if request.args.get('draft') else None
+    return render_template('index.html',
+                           draft_id=draft['id'] if draft else None,
+                           draft_version=draft['version'] if draft else None,
+                           draft=draft['data'] if draft else {})
 
 @app.route('/resume', methods=['POST'])
 def resume_html_display():
@@ -37,6 +213,7 @@ def resume_html_display():
     experience = request.form.get('experience')
     reference = request.form.get('reference')
     template_style = request.form.get('template_style', 'minimal')
+    check_field_sizes(request.form)
 
     # Collect all data into a dictionary
     resume_data = {
@@ -51,103 +228,427 @@ def resume_html_display():
         'reference': reference
     }
 
-    # IMPORTANT DEBUGGING LINE: Print the resume_data dictionary to the Flask terminal
-    print(f"DEBUG: resume_data sent to template: {resume_data}")
+    # Save the submission as a draft so the page can fetch its PDF by id.
+    # Without one the page still works, it just posts the whole resume again.
+    draft_id = None
+    try:
+        draft_id = save_form_draft(request.form.get('draft_id'), resume_data)
+    except sqlite3.Error as e:
+        app.logger.error(f"Could not save resume draft: {e}", exc_info=True)
+
+    return render_resume_page(resume_data, template_style, draft_id)
+
+def save_form_draft(draft_id, resume_data):
+    if draft_id:
+        try:
+            return drafts.update(draft_id, resume_data)['id']
+        except DraftNotFound:
+            pass
+    return drafts.create(resume_data)['id']
+
+def render_resume_page(resume_data, template_style, draft_id=None):
+    # Fields missing from the form or from a partial draft render as empty, like in the PDF
+    resume_data = {field: resume_data.get(field) or '' for field in RESUME_FIELDS}
 
     # Select the correct template based on user's choice
-    if template_style == 'professional':
-        resume_template = 'template_professional.html'
-    else:
-        resume_template = 'template_minimal.html'
-
-    return render_template(resume_template,
-                           name=name,
-                           email=email,
-                           phone=phone,
-                           linkedin=linkedin,
-                           summary=summary,
-                           skills=skills,
-                           education=education,
-                           experience=experience,
-                           reference=reference,
-                           resume_data=resume_data) # <--- Passed the dictionary 'resume_data' here
+    # Labelled with the template actually chosen: template_style is user input and would add unbounded series
+    with metrics.timer('resume_html_stage_seconds', stage='select'):
+        if template_style == 'professional':
+            resume_template = 'template_professional.html'
+        else:
+            resume_template = 'template_minimal.html'
+
+    with metrics.timer('resume_html_stage_seconds', stage='render', template=resume_template):
+        return render_template(resume_template,
+                               name=resume_data['name'],
+                               email=resume_data['email'],
+                               phone=resume_data['phone'],
+                               linkedin=resume_data['linkedin'],
+                               summary=resume_data['summary'],
+                               skills=resume_data['skills'],
+                               education=resume_data['education'],
+                               experience=resume_data['experience'],
+                               reference=resume_data['reference'],
+                               resume_data=resume_data, # <--- Passed the dictionary 'resume_data' here
+                               draft_id=draft_id)
+
+def pdf_renderer():
+    """Import the ReportLab stack on first use, so workers that only serve HTML pages never load it."""
+    import pdf_render
+    return pdf_render
+
+def warm_up(pdf=True):
+    """Compile every template and, with `pdf`, load ReportLab and render once, before taking traffic."""
+    sample = {field: 'Warmup' for field in RESUME_FIELDS}
+    with app.test_request_context():
+        for template in app.jinja_env.list_templates():
+            app.jinja_env.get_template(template)
+        render_template('index.html', draft={}, draft_id=None, draft_version=None)
+        for template in ('template_minimal.html', 'template_professional.html'):
+            render_template(template, resume_data=sample, draft_id=None, **sample)
+    if pdf:
+        pdf_renderer().render_resume_pdf(normalize_resume_fields(sample))
+    # Warm-up timings are not real traffic
+    metrics.reset()
+
+def normalize_resume_fields(data):
+    """Pick the resume fields out of a request payload, filling in the PDF defaults."""
+    fields = {}
+    for field in RESUME_FIELDS:
+        value = data.get(field)
+        if value is None:
+            value = 'Applicant Name' if field == 'name' else ''
+        fields[field] = str(value)
+    return fields
+
+def resume_pdf_filename(name):
+    # Generate a safe filename
+    return f"{name.replace(' ', '_').strip()}_Resume.pdf"
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    # '*' is not a match: it says nothing about whether the client has this particular PDF
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return f'"{etag}"' in candidates or f'W/"{etag}"' in candidates
+
+def resume_pdf_response(fields):
+    """Send the PDF for normalized resume fields, rendering it only if it is not cached."""
+    cache_key = resume_cache_key(fields, PDF_LAYOUT_VERSION)
+
+    # The key covers every input of the render, so a matching ETag means the client already has this PDF
+    if etag_matches(request.headers.get('If-None-Match'), cache_key):
+        response = app.response_class(status=304)
+        response.set_etag(cache_key)
+        return response
+
+    pdf_bytes = cached_pdf(cache_key)
+    if pdf_bytes is None:
+        spool = tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
+        try:
+            pdf_renderer().render_resume_pdf_to(fields, spool)
+        except Exception:
+            spool.close()
+            raise
+        if spool.tell() > PDF_SPOOL_MAX_BYTES:
+            # Too big to keep in memory or cache: stream it from the spilled temp file
+            size = spool.tell()
+            spool.seek(0)
+            with metrics.timer('resume_pdf_stage_seconds', stage='send'):
+                # send_file streams the file in chunks and closes (deleting) it once the response is done
+                response = send_file(spool, as_attachment=True, download_name=resume_pdf_filename(fields['name']),
+                                     mimetype='application/pdf', etag=False)
+            response.content_length = size
+            response.set_etag(cache_key)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        spool.seek(0)
+        pdf_bytes = spool.read()
+        spool.close()
+        pdf_cache.put(cache_key, pdf_bytes)
+
+    with metrics.timer('resume_pdf_stage_seconds', stage='send'):
+        response = send_file(io.BytesIO(pdf_bytes), as_attachment=True,
+                             download_name=resume_pdf_filename(fields['name']),
+                             mimetype='application/pdf', etag=False)
+    response.set_etag(cache_key)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @app.route('/generate_resume_pdf', methods=['POST'])
 def generate_resume_pdf():
     try:
-        data = request.json
-        if not data:
-            app.logger.warning("PDF generation requested with no data.")
-            return jsonify({"error": "No data provided"}), 400
-
-        name = data.get('name', 'Applicant Name')
-        email = data.get('email', '')
-        phone = data.get('phone', '')
-        linkedin = data.get('linkedin', '')
-        summary = data.get('summary', '')
-        skills = data.get('skills', '')
-        education_str = data.get('education', '')
-        experience_str = data.get('experience', '')
-        reference_str = data.get('reference', '')
-
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        story = []
-
-        # Add content to the PDF
-        story.append(Paragraph(name, styles['Heading1Centered']))
-        contact_info_parts = [email]
-        if phone:
-            contact_info_parts.append(phone)
-        if linkedin:
-            contact_info_parts.append(f'<a href="{linkedin}" color="blue">{linkedin}</a>')
-
-        if contact_info_parts:
-            contact_line = ' | '.join(contact_info_parts)
-            story.append(Paragraph(contact_line, styles['Normal']))
-        story.append(Spacer(1, 0.1 * inch))
-
-        if summary:
-            story.append(Paragraph("Summary", styles['SectionHeading']))
-            story.append(Paragraph(summary, styles['Normal']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        if skills:
-            story.append(Paragraph("Skills", styles['SectionHeading']))
-            story.append(Paragraph(skills, styles['Normal']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        if education_str:
-            story.append(Paragraph("Education", styles['SectionHeading']))
-            for line in education_str.split('\n'):
-                if line.strip():
-                    story.append(Paragraph(line.strip(), styles['Normal']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        if experience_str:
-            story.append(Paragraph("Experience", styles['SectionHeading']))
-            for line in experience_str.split('\n'):
-                if line.strip():
-                    story.append(Paragraph(line.strip(), styles['ListItem']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        if reference_str:
-            story.append(Paragraph("References", styles['SectionHeading']))
-            story.append(Paragraph(reference_str, styles['Normal']))
-            story.append(Spacer(1, 0.1 * inch))
-
-        doc.build(story)
-        buffer.seek(0)
-
-        # Generate a safe filename
-        filename = f"{name.replace(' ', '_').strip()}_Resume.pdf"
-
-        return send_file(buffer, as_attachment=True, download_name=filename, mimetype='application/pdf')
+        with metrics.timer('resume_pdf_stage_seconds', stage='parse'):
+            data = request.json
+            if not data:
+                app.logger.warning("PDF generation requested with no data.")
+                return jsonify({"error": "No data provided"}), 400
+
+            check_field_sizes(data)
+            fields = normalize_resume_fields(data)
 
+        return resume_pdf_response(fields)
+
+    except HTTPException:
+        raise
     except Exception as e:
         app.logger.error(f"Error generating resume PDF: {e}", exc_info=True)
         return jsonify({"error": f"Failed to generate resume PDF: {str(e)}"}), 500
 
+@app.route('/generate_resume_pdfs', methods=['POST'])
+def generate_resume_pdfs():
+    """Render many resumes at once and stream them back as a ZIP.
+
+    Accepts a JSON array of resume payloads, or NDJSON (one payload per line)
+    when sent as application/x-ndjson. PDFs are added to the archive as they
+    finish; manifest.json at the end records the outcome of every item.
+    """
+    from concurrent.futures.process import BrokenProcessPool
+
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        items = iter_ndjson(request.stream)
+    else:
+        data = request.get_json(silent=True)
+        if not isinstance(data, list):
+            app.logger.warning("Batch PDF generation requested without a JSON array.")
+            return jsonify({"error": "Expected a JSON array of resumes or an NDJSON body"}), 400
+        items = iter_json_array(data)
+
+    def generate():
+        sink = ZipStreamWriter()
+        manifest = []
+        in_flight = {}
+        retries = deque()
+
+        def add_pdf(entry, pdf_bytes):
+            zf.writestr(zip_entry(entry['filename']), pdf_bytes)
+            entry['status'] = 'ok'
+            entry['bytes'] = len(pdf_bytes)
+
+        def submit(entry, cache_key, fields, attempt=1):
+            try:
+                in_flight[submit_render(fields)] = (entry, cache_key, fields, attempt)
+            except BrokenProcessPool as e:
+                entry.update(status='error', error=f"Render worker crashed: {e}")
+
+        def collect(futures):
+            for future in futures:
+                entry, cache_key, fields, attempt = in_flight.pop(future)
+                try:
+                    pdf_bytes = future.result()
+                except BrokenProcessPool as e:
+                    reset_render_pool(future)
+                    # A crashing worker fails every render in flight, not only its own; retry each once
+                    if attempt == 1:
+                        retries.append((entry, cache_key, fields))
+                    else:
+                        entry.update(status='error', error=f"Render worker crashed: {e}")
+                except Exception as e:
+                    entry.update(status='error', error=str(e))
+                else:
+                    pdf_cache.put(cache_key, pdf_bytes)
+                    add_pdf(entry, pdf_bytes)
+            # Retries run one at a time, so an item that crashes again cannot take other retries down with it
+            while retries and not any(attempt == 2 for _, _, _, attempt in in_flight.values()):
+                submit(*retries.popleft(), attempt=2)
+
+        with zipfile.ZipFile(sink, 'w') as zf:
+            for index, payload, error in items:
+                entry = {'index': index}
+                manifest.append(entry)
+                if error:
+                    entry.update(status='error', error=error)
+                    continue
+                try:
+                    check_field_sizes(payload)
+                except RequestEntityTooLarge as e:
+                    entry.update(status='error', error=e.description)
+                    continue
+
+                fields = normalize_resume_fields(payload)
+                safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', resume_pdf_filename(fields['name']))
+                entry['filename'] = f"{index:05d}_{safe_name}"
+                cache_key = resume_cache_key(fields, PDF_LAYOUT_VERSION)
+                pdf_bytes = cached_pdf(cache_key)
+                if pdf_bytes is not None:
+                    add_pdf(entry, pdf_bytes)
+                else:
+                    submit(entry, cache_key, fields)
+
+                # Keep a bounded number of renders queued so large batches never pile up in memory
+                if len(in_flight) >= PDF_BATCH_WORKERS * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+                yield sink.drain()
+
+            failed = sum(1 for entry in manifest if entry['status'] != 'ok')
+            zf.writestr(zip_entry('manifest.json'), json.dumps(
+                {'total': len(manifest), 'failed': failed, 'items': manifest}, indent=2))
+        yield sink.drain()
+
+    response = app.response_class(stream_with_context(generate()), mimetype='application/zip')
+    response.headers['Content-Disposition'] = 'attachment; filename=resumes.zip'
+    return response
+
+def pdf_job_response(job):
+    body = {'job_id': job['job_id'], 'status': job['status'],
+            'status_url': url_for('pdf_job_status', job_id=job['job_id'])}
+    if job['status'] == 'done':
+        body['download_url'] = url_for('pdf_job_download', job_id=job['job_id'])
+    elif job['status'] == 'failed':
+        body['error'] = job.get('error')
+    return body
+
+@app.route('/pdf_jobs', methods=['POST'])
+def submit_pdf_job():
+    data = request.get_json(silent=True)
+    if not data or not isinstance(data, dict):
+        app.logger.warning("PDF job submitted with no data.")
+        return jsonify({"error": "No data provided"}), 400
+
+    if 'draft_id' in data:
+        draft = drafts.get(str(data['draft_id']))
+        if draft is None:
+            return jsonify({"error": "Unknown draft"}), 404
+        data = draft['data']
+
+    check_field_sizes(data)
+    fields = normalize_resume_fields(data)
+    cache_key = resume_cache_key(fields, PDF_LAYOUT_VERSION)
+    try:
+        job_id = pdf_jobs.submit(fields, resume_pdf_filename(fields['name']), cache_key,
+                                 cached_pdf=cached_pdf(cache_key))
+    except QueueFull:
+        response = jsonify({"error": "PDF render queue is full, please retry shortly"})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(PDF_JOB_RETRY_AFTER)
+        return response
+    except Exception as e:
+        app.logger.error(f"Error submitting PDF job: {e}", exc_info=True)
+        return jsonify({"error": f"Failed to submit PDF job: {str(e)}"}), 500
+
+    response = jsonify(pdf_job_response(pdf_jobs.status(job_id)))
+    response.status_code = 202
+    response.headers['Location'] = url_for('pdf_job_status', job_id=job_id)
+    return response
+
+@app.route('/pdf_jobs/<job_id>')
+def pdf_job_status(job_id):
+    job = pdf_jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    response = jsonify(pdf_job_response(job))
+    if job['status'] == 'queued':
+        response.headers['Retry-After'] = '1'
+    return response
+
+@app.route('/pdf_jobs/<job_id>/download')
+def pdf_job_download(job_id):
+    job = pdf_jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    if job['status'] != 'done':
+        return jsonify(pdf_job_response(job)), 409
+
+    if etag_matches(request.headers.get('If-None-Match'), job['cache_key']):
+        response = app.response_class(status=304)
+        response.set_etag(job['cache_key'])
+        return response
+    try:
+        response = send_file(pdf_jobs.artifact_path(job_id), as_attachment=True,
+                             download_name=job['filename'], mimetype='application/pdf', etag=False)
+    except FileNotFoundError:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    response.set_etag(job['cache_key'])
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def draft_response(draft, status=200):
+    body = dict(draft, links={
+        'self': url_for('get_draft', draft_id=draft['id']),
+        'resume': url_for('draft_resume_page', draft_id=draft['id']),
+        'pdf': url_for('draft_pdf', draft_id=draft['id']),
+        'edit': url_for('index', draft=draft['id']),
+    })
+    response = jsonify(body)
+    response.status_code = status
+    response.set_etag(str(draft['version']))
+    return response
+
+@app.route('/drafts', methods=['POST'])
+def create_draft():
+    data = request.get_json(silent=True) if request.is_json else request.form
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "No data provided"}), 400
+    check_field_sizes(data)
+    draft = drafts.create(data)
+    response = draft_response(draft, status=201)
+    response.headers['Location'] = url_for('get_draft', draft_id=draft['id'])
+    return response
+
+@app.route('/drafts/<draft_id>')
+def get_draft(draft_id):
+    draft = drafts.get(draft_id)
+    if draft is None:
+        return jsonify({"error": "Unknown draft"}), 404
+    return draft_response(draft)
+
+@app.route('/drafts/<draft_id>', methods=['PATCH'])
+def update_draft(draft_id):
+    """Change only the fields present in the JSON body.
+
+    Send the version you edited in If-Match (or as "version" in the body) to
+    get 412 instead of overwriting someone else's newer change.
+    """
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict):
+        return jsonify({"error": "Expected a JSON object of changed fields"}), 400
+    check_field_sizes(changes)
+
+    expected_version = changes.get('version')
+    if request.if_match and not request.if_match.star_tag:
+        expected_version = next(iter(request.if_match.as_set()), None)
+    try:
+        expected_version = parse_draft_version(expected_version)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Version must be an integer"}), 400
+
+    try:
+        draft = drafts.update(draft_id, changes, expected_version=expected_version)
+    except DraftNotFound:
+        return jsonify({"error": "Unknown draft"}), 404
+    except VersionConflict as e:
+        return jsonify({"error": str(e), "version": e.current_version}), 412
+    return draft_response(draft)
+
+def parse_draft_version(value):
+    """Return a draft version from If-Match (a string) or a JSON body (an integer), or None if absent."""
+    if value is None:
+        return None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"Invalid version {value!r}")
+
+@app.route('/drafts/<draft_id>/resume')
+def draft_resume_page(draft_id):
+    draft = drafts.get(draft_id)
+    if draft is None:
+        return jsonify({"error": "Unknown draft"}), 404
+    return render_resume_page(draft['data'], request.args.get('template_style', 'minimal'), draft['id'])
+
+@app.route('/drafts/<draft_id>/pdf')
+def draft_pdf(draft_id):
+    try:
+        draft = drafts.get(draft_id)
+        if draft is None:
+            return jsonify({"error": "Unknown draft"}), 404
+        return resume_pdf_response(normalize_resume_fields(draft['data']))
+    except HTTPException:
+        raise
+    except Exception as e:
+        app.logger.error(f"Error generating resume PDF for draft {draft_id}: {e}", exc_info=True)
+        return jsonify({"error": f"Failed to generate resume PDF: {str(e)}"}), 500
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return app.response_class(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/pdf_cache_stats')
+def pdf_cache_stats():
+    # Section stats cover renders done in this process; pool workers keep their own section caches.
+    # A worker that has not rendered a PDF yet reports none rather than importing ReportLab here.
+    pdf_render = sys.modules.get('pdf_render')
+    return jsonify({'pdf': pdf_cache.stats(), 'sections': pdf_render.section_cache.stats() if pdf_render else None})
+
 if __name__ == '__main__':
    port = int(os.environ.get('PORT', 5000))
    app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
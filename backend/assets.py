@@ -0,0 +1,228 @@
+"""Static asset pipeline.
+
+Builds content-hashed copies of the files in frontend/static into
+frontend/static/build, together with:
+
+* resized and WebP variants of images (needs Pillow),
+* gzip and brotli copies of CSS and JS (brotli is optional),
+* manifest.json mapping each source path to its hashed build path.
+
+Run `python backend/assets.py` as a build step, or set BUILD_ASSETS_ON_STARTUP=1
+to build when the app starts. Templates use `asset_url('static', filename=...)`,
+which falls back to the plain static URL for anything not in the manifest.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'static'))
+BUILD_DIR = os.path.join(STATIC_DIR, 'build')
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'manifest.json')
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js')
+IMAGE_WIDTHS = (480, 960, 1440)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?/static/([^\'")]+)[\'"]?\s*\)')
+BACKGROUND_URL_RE = re.compile(r'(background-image|background)\s*:\s*url\(\s*[\'"]?/static/([^\'")]+)[\'"]?\s*\)\s*;')
+RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _hashed_name(rel_path, data, suffix='', ext=None):
+    root, original_ext = os.path.splitext(rel_path)
+    return f"{root}{suffix}.{_digest(data)}{ext or original_ext}"
+
+
+def _write(rel_path, data):
+    path = os.path.join(BUILD_DIR, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    os.chmod(path, 0o644)
+
+
+def _encode_image(image, fmt):
+    from io import BytesIO
+    out = BytesIO()
+    if fmt == 'webp':
+        image.save(out, 'WEBP', quality=WEBP_QUALITY, method=6)
+    elif fmt == 'png':
+        image.save(out, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _build_image(rel_path, data, manifest):
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.warning(f"Pillow is not installed, skipping variants of {rel_path}")
+        return
+
+    from io import BytesIO
+    original = Image.open(BytesIO(data))
+    original.load()
+    fmt = 'png' if rel_path.lower().endswith('.png') else 'jpeg'
+    variants = []
+    widths = [w for w in IMAGE_WIDTHS if w < original.width] + [original.width]
+    for width in widths:
+        if width == original.width:
+            image = original
+        else:
+            height = round(original.height * width / original.width)
+            image = original.resize((width, height), Image.LANCZOS)
+        for variant_fmt in (fmt, 'webp'):
+            encoded = _encode_image(image, variant_fmt)
+            if variant_fmt == fmt and width == original.width and len(encoded) >= len(data):
+                continue  # re-encoding did not beat the original, which is listed below anyway
+            ext = '.webp' if variant_fmt == 'webp' else None
+            suffix = '' if width == original.width else f"-{width}w"
+            variant_path = _hashed_name(rel_path, encoded, suffix=suffix, ext=ext)
+            _write(variant_path, encoded)
+            variants.append({'path': variant_path, 'width': width, 'type': f"image/{variant_fmt}"})
+    variants.append({'path': manifest['files'][rel_path], 'width': original.width, 'type': f"image/{fmt}"})
+    manifest['variants'][rel_path] = variants
+
+
+def _rewrite_css(data, manifest):
+    """Point /static/... references in CSS at hashed builds, adding a WebP image-set where one exists."""
+    css = data.decode('utf-8')
+
+    def replace_background(match):
+        prop, rel_path = match.group(1), match.group(2)
+        hashed = manifest['files'].get(rel_path)
+        if hashed is None:
+            return match.group(0)
+        variants = manifest['variants'].get(rel_path)
+        if not variants:
+            return f"{prop}: url(/assets/{hashed});"
+        # Backgrounds are drawn full size: use the full-width WebP and the smallest full-width fallback
+        original_type = variants[-1]['type']
+        full_width = variants[-1]['width']
+        fallback = min((v for v in variants if v['type'] == original_type and v['width'] == full_width),
+                       key=lambda v: os.path.getsize(os.path.join(BUILD_DIR, v['path'])))
+        declaration = f"{prop}: url(/assets/{fallback['path']});"
+        webp = [v for v in variants if v['type'] == 'image/webp' and v['width'] == full_width]
+        if webp:
+            # Browsers without image-set() keep the plain url() declared above
+            declaration += (f"\n    {prop}: image-set(url(/assets/{webp[0]['path']}) type(\"image/webp\"), "
+                            f"url(/assets/{fallback['path']}) type(\"{original_type}\"));")
+        return declaration
+
+    def replace_url(match):
+        hashed = manifest['files'].get(match.group(1))
+        return f"url(/assets/{hashed})" if hashed else match.group(0)
+
+    responsive = _responsive_backgrounds(css, manifest)
+    css = BACKGROUND_URL_RE.sub(replace_background, css)
+    css = CSS_URL_RE.sub(replace_url, css)
+    return (css + responsive).encode('utf-8')
+
+
+def _responsive_backgrounds(css, manifest):
+    """Media queries that swap each background image for its resized variants on narrower viewports.
+
+    Only top-level rules are handled; a background inside @media or another
+    block keeps the full-size image.
+    """
+    blocks = []
+    for rule in RULE_RE.finditer(css):
+        if css.count('{', 0, rule.start()) != css.count('}', 0, rule.start()):
+            continue
+        selector = ' '.join(COMMENT_RE.sub('', rule.group(1)).split())
+        for match in BACKGROUND_URL_RE.finditer(rule.group(2)):
+            variants = manifest['variants'].get(match.group(2))
+            if not variants:
+                continue
+            original_type = variants[-1]['type']
+            widths = sorted({v['width'] for v in variants if v['width'] < variants[-1]['width']}, reverse=True)
+            # Widest first, so the narrowest matching query comes last and wins
+            for width in widths:
+                by_type = {v['type']: v['path'] for v in variants if v['width'] == width}
+                if original_type not in by_type:
+                    continue
+                declarations = f"background-image: url(/assets/{by_type[original_type]});"
+                if 'image/webp' in by_type:
+                    declarations += (f" background-image: image-set(url(/assets/{by_type['image/webp']}) "
+                                     f"type(\"image/webp\"), url(/assets/{by_type[original_type]}) "
+                                     f"type(\"{original_type}\"));")
+                blocks.append(f"@media (max-width: {width}px) {{ {selector} {{ {declarations} }} }}")
+    return '\n' + '\n'.join(blocks) + '\n' if blocks else ''
+
+
+def _write_compressed(rel_path, data):
+    _write(rel_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        return
+    _write(rel_path + '.br', brotli.compress(data, quality=11))
+
+
+def build_assets():
+    """Build every asset under STATIC_DIR and return the manifest."""
+    manifest = {'files': {}, 'variants': {}}
+    sources = []
+    for dirpath, dirnames, filenames in os.walk(STATIC_DIR):
+        if os.path.abspath(dirpath).startswith(BUILD_DIR):
+            dirnames[:] = []
+            continue
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, filename), STATIC_DIR).replace(os.sep, '/')
+            sources.append(rel_path)
+
+    # Images first so stylesheets can be rewritten to point at their hashed names
+    sources.sort(key=lambda p: (not p.lower().endswith(IMAGE_EXTENSIONS), p))
+    for rel_path in sources:
+        with open(os.path.join(STATIC_DIR, rel_path), 'rb') as f:
+            data = f.read()
+        ext = os.path.splitext(rel_path)[1].lower()
+        if ext == '.css':
+            data = _rewrite_css(data, manifest)
+        hashed = _hashed_name(rel_path, data)
+        _write(hashed, data)
+        manifest['files'][rel_path] = hashed
+        if ext in IMAGE_EXTENSIONS:
+            _build_image(rel_path, data, manifest)
+        elif ext in COMPRESSIBLE_EXTENSIONS:
+            _write_compressed(hashed, data)
+
+    _write('manifest.json', json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'files': {}, 'variants': {}}
+
+
+def clean():
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    clean()
+    built = build_assets()
+    for source, target in sorted(built['files'].items()):
+        print(f"{source} -> {target}")
@@ -0,0 +1,174 @@
+"""Server-side resume drafts stored in SQLite.
+
+Each draft has an id, a version that increases on every change and a hash of
+its content. Drafts that have not changed for `ttl_seconds` are deleted. The
+database runs in WAL mode so readers in one gunicorn worker never block on a
+writer in another, and each process keeps a small pool of connections instead
+of opening one per request.
+"""
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+DRAFT_ID_LENGTH = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class DraftNotFound(Exception):
+    pass
+
+
+class VersionConflict(Exception):
+    """Raised when an update names a version that is no longer the current one."""
+
+    def __init__(self, current_version):
+        super().__init__(f"Draft is at version {current_version}")
+        self.current_version = current_version
+
+
+def content_hash(data):
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class DraftStore:
+    def __init__(self, path, fields, pool_size=4, busy_timeout=5.0, ttl_seconds=0):
+        self.path = path
+        self.fields = tuple(fields)
+        self.pool_size = pool_size
+        self.busy_timeout = busy_timeout
+        self.ttl_seconds = ttl_seconds  # 0 keeps drafts forever
+        self._pid = None
+        self._idle = None
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL with synchronous=NORMAL only risks the last commits on power loss, never corruption
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(SCHEMA)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            # Connections must not cross a fork (gunicorn preload); start a fresh pool in each process
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._idle = queue.LifoQueue(maxsize=self.pool_size)
+            idle = self._idle
+        try:
+            conn = idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _cutoff(self):
+        # Rows last updated before this are expired, even if no sweep has deleted them yet
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0.0
+
+    def sweep_expired(self, min_interval=60):
+        """Delete expired drafts, at most once per `min_interval` seconds."""
+        if not self.ttl_seconds:
+            return
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < min_interval:
+                return
+            self._last_sweep = now
+        with self.connection() as conn:
+            conn.execute('DELETE FROM drafts WHERE updated_at < ?', (self._cutoff(),))
+
+    def _clean(self, data):
+        return {field: (None if data.get(field) is None else str(data[field])) for field in self.fields}
+
+    def _row_to_draft(self, row):
+        return {
+            'id': row['id'],
+            'version': row['version'],
+            'content_hash': row['content_hash'],
+            'data': json.loads(row['data']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+    def create(self, data):
+        self.sweep_expired()
+        data = self._clean(data)
+        now = time.time()
+        draft = {'id': uuid.uuid4().hex, 'version': 1, 'content_hash': content_hash(data), 'data': data,
+                 'created_at': now, 'updated_at': now}
+        with self.connection() as conn:
+            conn.execute('INSERT INTO drafts (id, version, content_hash, data, created_at, updated_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         (draft['id'], draft['version'], draft['content_hash'], json.dumps(data), now, now))
+        return draft
+
+    def get(self, draft_id):
+        if len(draft_id) != DRAFT_ID_LENGTH:
+            return None
+        with self.connection() as conn:
+            row = conn.execute('SELECT * FROM drafts WHERE id = ? AND updated_at >= ?',
+                               (draft_id, self._cutoff())).fetchone()
+        return self._row_to_draft(row) if row else None
+
+    def update(self, draft_id, changes, expected_version=None):
+        """Apply the fields in `changes` to a draft and return it.
+
+        Fields not in `changes` keep their stored value. The version only
+        increases when the content actually changes.
+        """
+        changes = {field: changes[field] for field in self.fields if field in changes}
+        with self.connection() as conn:
+            # IMMEDIATE takes the write lock up front so concurrent updates cannot interleave
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT * FROM drafts WHERE id = ? AND updated_at >= ?',
+                               (draft_id, self._cutoff())).fetchone()
+            if row is None:
+                conn.rollback()
+                raise DraftNotFound(draft_id)
+            draft = self._row_to_draft(row)
+            if expected_version is not None and expected_version != draft['version']:
+                conn.rollback()
+                raise VersionConflict(draft['version'])
+
+            data = self._clean(dict(draft['data'], **changes))
+            new_hash = content_hash(data)
+            if new_hash == draft['content_hash']:
+                conn.rollback()
+                return draft
+
+            draft.update(data=data, content_hash=new_hash, version=draft['version'] + 1, updated_at=time.time())
+            conn.execute('UPDATE drafts SET version = ?, content_hash = ?, data = ?, updated_at = ? WHERE id = ?',
+                         (draft['version'], new_hash, json.dumps(data), draft['updated_at'], draft_id))
+            conn.commit()
+        return draft
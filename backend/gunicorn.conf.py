@@ -0,0 +1,70 @@
+# Run with: gunicorn --config backend/gunicorn.conf.py --chdir backend app:app
+import gc
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import metrics
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Requests run on threads while each worker's main loop keeps heartbeating, so a long batch export
+# (/generate_resume_pdfs) is not killed by gunicorn's `timeout` halfway through its ZIP
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# PRELOAD_APP=1 imports the app once in the master; forked workers then share its memory copy-on-write
+preload_app = os.environ.get('PRELOAD_APP', '0') == '1'
+# WARMUP=1 compiles the templates (and, with PRELOAD_APP, loads ReportLab) before workers take traffic
+warmup = os.environ.get('WARMUP', '0') == '1'
+
+# All workers snapshot their metrics into one directory so /metrics reports totals for the whole server.
+# mkdtemp creates a fresh private directory, so no other user can pre-create or write into it.
+if not os.environ.get('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix='resume_metrics_')
+    _own_metrics_dir = True
+else:
+    _own_metrics_dir = False
+
+
+# BUILD_ASSETS_ON_STARTUP=1 builds the static assets once, here in the master, before the app is imported
+# (with or without preload_app); workers then only load the manifest instead of each rebuilding every image
+if os.environ.get('BUILD_ASSETS_ON_STARTUP', '0') == '1':
+    import assets
+    assets.build_assets()
+    os.environ['BUILD_ASSETS_ON_STARTUP'] = '0'
+
+
+def on_starting(server):
+    metrics.clear_dir()
+
+
+def when_ready(server):
+    if preload_app and warmup:
+        from app import warm_up
+        warm_up(pdf=True)
+        # Keep the warmed objects out of the collector's reach so it does not touch (and copy) their pages
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    metrics.reset()
+
+
+def worker_exit(server, worker):
+    metrics.flush()
+
+
+def on_exit(server):
+    if _own_metrics_dir:
+        shutil.rmtree(os.environ['METRICS_DIR'], ignore_errors=True)
+
+
+def post_worker_init(worker):
+    if warmup and not preload_app:
+        # Without a shared parent, leave ReportLab to load lazily on the first PDF request
+        from app import warm_up
+        warm_up(pdf=False)
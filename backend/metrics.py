@@ -0,0 +1,261 @@
+"""In-process timing histograms and counters, served in Prometheus text format.
+
+Each process keeps its own metrics in memory. A background thread snapshots
+them to `<METRICS_DIR>/<pid>.json` every FLUSH_INTERVAL seconds when they have
+changed, and once more when the process exits. The /metrics endpoint merges the
+snapshots of every process, so totals are correct no matter which gunicorn
+worker answers. Without METRICS_DIR only the answering process is reported.
+"""
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+
+_lock = threading.Lock()
+_histograms = {}  # name -> {'help', 'buckets', 'series': {labels: [counts, sum, count]}}
+_counters = {}  # name -> {'help', 'series': {labels: value}}
+_dirty = False  # recorded anything since the last snapshot
+_flusher_pid = None  # process the flush thread was started in; threads do not survive a fork
+_flush_failing = False
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe_histogram(name, help_text, buckets=DEFAULT_BUCKETS):
+    with _lock:
+        _histograms.setdefault(name, {'help': help_text, 'buckets': tuple(buckets), 'series': {}})
+
+
+def describe_counter(name, help_text):
+    with _lock:
+        _counters.setdefault(name, {'help': help_text, 'series': {}})
+
+
+def observe(name, value, **labels):
+    """Record `value` in histogram `name`, which must have been described first."""
+    global _dirty
+    histogram = _histograms[name]
+    key = _label_key(labels)
+    _ensure_flusher()
+    with _lock:
+        _dirty = True
+        series = histogram['series'].get(key)
+        if series is None:
+            series = histogram['series'][key] = [[0] * len(histogram['buckets']), 0.0, 0]
+        for i, bound in enumerate(histogram['buckets']):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+
+def inc(name, amount=1, **labels):
+    global _dirty
+    counter = _counters[name]
+    key = _label_key(labels)
+    _ensure_flusher()
+    with _lock:
+        _dirty = True
+        counter['series'][key] = counter['series'].get(key, 0) + amount
+
+
+@contextmanager
+def timer(name, **labels):
+    """Observe the wall time of the block, in seconds, in histogram `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def reset():
+    """Forget everything recorded so far, e.g. in a freshly forked child that inherited the parent's metrics.
+
+    This process's snapshot in METRICS_DIR is removed too, so /metrics stops counting it.
+    """
+    global _dirty
+    with _lock:
+        for histogram in _histograms.values():
+            histogram['series'].clear()
+        for counter in _counters.values():
+            counter['series'].clear()
+        _dirty = False
+    directory = metrics_dir()
+    if directory:
+        try:
+            os.remove(os.path.join(directory, f"{os.getpid()}.json"))
+        except OSError:
+            pass
+
+
+def metrics_dir():
+    # Read lazily: gunicorn may set METRICS_DIR after a preloaded app was imported
+    return os.environ.get('METRICS_DIR') or None
+
+
+def _snapshot():
+    with _lock:
+        return {
+            'histograms': {
+                name: {'help': h['help'], 'buckets': list(h['buckets']),
+                       'series': [[list(key), list(counts), total, count]
+                                  for key, (counts, total, count) in h['series'].items()]}
+                for name, h in _histograms.items()
+            },
+            'counters': {
+                name: {'help': c['help'], 'series': [[list(key), value] for key, value in c['series'].items()]}
+                for name, c in _counters.items()
+            },
+        }
+
+
+def flush():
+    """Write this process's snapshot to METRICS_DIR, so other processes see everything recorded so far.
+
+    Errors are logged, not raised: a full or unwritable METRICS_DIR must not fail requests.
+    """
+    global _dirty, _flush_failing
+    directory = metrics_dir()
+    if not directory:
+        return
+    with _lock:
+        _dirty = False
+    tmp_path = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(_snapshot(), f)
+        os.replace(tmp_path, os.path.join(directory, f"{os.getpid()}.json"))
+    except OSError as e:
+        with _lock:
+            _dirty = True  # try again on the next tick
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if not _flush_failing:
+            logger.warning(f"Could not write metrics snapshot to {directory}: {e}")
+        _flush_failing = True
+    else:
+        _flush_failing = False
+
+
+def _flush_loop():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        if _dirty:
+            flush()
+
+
+def _ensure_flusher():
+    """Start this process's flush thread on first use, and register the final flush at exit."""
+    global _flusher_pid
+    pid = os.getpid()
+    if _flusher_pid == pid or not metrics_dir():
+        return
+    with _lock:
+        if _flusher_pid == pid:
+            return
+        _flusher_pid = pid
+    threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+    atexit.register(flush)
+
+
+def _load_snapshots():
+    directory = metrics_dir()
+    if not directory:
+        return [_snapshot()]
+    flush()
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        # Already logged by flush(); report this process alone rather than failing the scrape
+        return [_snapshot()]
+    snapshots = []
+    for entry in entries:
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def render_prometheus():
+    """Merge all process snapshots and render them in the Prometheus text exposition format."""
+    histograms = {}
+    counters = {}
+    for snapshot in _load_snapshots():
+        for name, h in snapshot.get('histograms', {}).items():
+            merged = histograms.setdefault(name, {'help': h['help'], 'buckets': h['buckets'], 'series': {}})
+            if merged['buckets'] != h['buckets']:
+                continue
+            for key, counts, total, count in h['series']:
+                key = tuple(tuple(pair) for pair in key)
+                series = merged['series'].setdefault(key, [[0] * len(counts), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+        for name, c in snapshot.get('counters', {}).items():
+            merged = counters.setdefault(name, {'help': c['help'], 'series': {}})
+            for key, value in c['series']:
+                key = tuple(tuple(pair) for pair in key)
+                merged['series'][key] = merged['series'].get(key, 0) + value
+
+    lines = []
+    for name in sorted(histograms):
+        h = histograms[name]
+        lines.append(f"# HELP {name} {h['help']}")
+        lines.append(f"# TYPE {name} histogram")
+        for key in sorted(h['series']):
+            counts, total, count = h['series'][key]
+            cumulative = 0
+            for bound, bucket_count in zip(h['buckets'], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', repr(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+    for name in sorted(counters):
+        c = counters[name]
+        lines.append(f"# HELP {name} {c['help']}")
+        lines.append(f"# TYPE {name} counter")
+        for key in sorted(c['series']):
+            lines.append(f"{name}{_format_labels(key)} {c['series'][key]}")
+    return '\n'.join(lines) + '\n'
+
+
+def clear_dir():
+    """Remove snapshots left by an earlier server run; called once from the gunicorn master."""
+    directory = metrics_dir()
+    if not directory or not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        if entry.name.endswith(('.json', '.tmp')):
+            os.remove(entry.path)
@@ -0,0 +1,138 @@
+"""Helpers for the batch PDF export endpoint: the render process pool,
+payload parsing and an incremental ZIP writer."""
+import json
+import os
+import threading
+import time
+import weakref
+import zipfile
+
+import metrics
+
+PDF_BATCH_WORKERS = int(os.environ.get('PDF_BATCH_WORKERS', os.cpu_count() or 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+# Which pool ran each render, so a BrokenProcessPool only ever resets the pool it came from
+_future_pools = weakref.WeakKeyDictionary()
+
+
+def init_render_worker():
+    from multiprocessing.util import Finalize
+    # Forked workers start with a copy of our metrics; reset so each sample is only counted once
+    metrics.reset()
+    # Pool processes leave through os._exit, which skips atexit; write the final snapshot from here instead
+    Finalize(None, metrics.flush, exitpriority=10)
+
+
+def get_render_pool():
+    """Return the process pool used for PDF rendering, creating it on first use.
+
+    Worker processes import pdf_render once and keep its module-level
+    stylesheet for every PDF they render.
+    """
+    global _pool
+    # Imported here so processes that never render a batch skip multiprocessing and ReportLab
+    from concurrent.futures import ProcessPoolExecutor
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PDF_BATCH_WORKERS, initializer=init_render_worker)
+        return _pool
+
+
+def reset_render_pool(future):
+    """Drop the pool that ran `future`, after it failed with BrokenProcessPool.
+
+    Failures from an older pool may still arrive after it was replaced; a
+    healthy current pool is left alone so its queued renders are not cancelled.
+    """
+    _drop_pool(_future_pools.get(future))
+
+
+def _drop_pool(broken_pool):
+    global _pool
+    with _pool_lock:
+        if broken_pool is not None and _pool is broken_pool:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def submit_render(fields):
+    """Queue a render on the pool and return its future."""
+    from concurrent.futures.process import BrokenProcessPool
+    from pdf_render import render_resume_pdf
+    pool = get_render_pool()
+    try:
+        future = pool.submit(render_resume_pdf, fields)
+    except BrokenProcessPool:
+        # A worker died earlier (e.g. OOM killed); start over with a fresh pool once
+        _drop_pool(pool)
+        pool = get_render_pool()
+        try:
+            future = pool.submit(render_resume_pdf, fields)
+        except BrokenProcessPool:
+            _drop_pool(pool)
+            raise
+    _future_pools[future] = pool
+    return future
+
+
+def iter_json_array(items):
+    """Yield (index, payload, error) for each item of a decoded JSON array."""
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            yield index, item, None
+        else:
+            yield index, None, "Item is not a JSON object"
+
+
+def iter_ndjson(stream):
+    """Yield (index, payload, error) for each non-blank line of an NDJSON stream.
+
+    The stream is read line by line so the whole batch is never buffered.
+    """
+    index = 0
+    for raw_line in stream:
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            yield index, None, f"Invalid JSON: {e}"
+        else:
+            if isinstance(item, dict):
+                yield index, item, None
+            else:
+                yield index, None, "Item is not a JSON object"
+        index += 1
+
+
+class ZipStreamWriter:
+    """Write-only file object that hands ZipFile output back in chunks.
+
+    It has no tell/seek, so ZipFile writes entries with data descriptors and
+    never needs to go back into bytes that were already sent.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_entry(filename):
+    info = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+    # PDF page streams are already compressed, deflating them again buys little
+    info.compress_type = zipfile.ZIP_STORED
+    return info
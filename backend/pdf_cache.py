@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def _layout_version():
+    """Hash of pdf_render.py's source and the installed ReportLab version.
+
+    Read as text so that computing it never imports ReportLab. Any edit to the
+    styles or story layout, or a ReportLab upgrade, changes the version, and
+    with it every cache key and ETag, so stale PDFs are never served.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    digest = hashlib.sha256()
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_render.py'), 'rb') as f:
+        digest.update(f.read())
+    try:
+        digest.update(version('reportlab').encode('utf-8'))
+    except PackageNotFoundError:
+        pass
+    return digest.hexdigest()[:16]
+
+
+PDF_LAYOUT_VERSION = _layout_version()
+
+
+def resume_cache_key(fields, layout_version):
+    """Return a stable hash for a normalized resume payload and layout version."""
+    canonical = json.dumps({'layout': layout_version, 'fields': fields},
+                           sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    """In-memory LRU of rendered PDFs bounded by total bytes, with an optional disk tier.
+
+    Entries are keyed by `resume_cache_key`, so a key always maps to the same
+    bytes and it is safe to share the disk directory between gunicorn workers.
+    The disk tier is bounded by `disk_max_bytes`; the least recently used
+    files (by modification time, refreshed on every disk hit) go first. The
+    directory is only scanned when this process's running total goes over
+    budget or DISK_RESCAN_INTERVAL has passed, which also picks up files
+    written by other workers.
+    """
+
+    DISK_RESCAN_INTERVAL = 60.0
+    # Trim below the budget, so a full cache is not rescanned on every write
+    DISK_TRIM_RATIO = 0.9
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._disk_size = None  # running estimate of the disk tier's bytes; None until the first scan
+        self._last_disk_scan = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf_bytes
+
+        pdf_bytes = self._read_disk(key)
+        with self._lock:
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._store(key, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        self._store(key, pdf_bytes)
+        self._write_disk(key, pdf_bytes)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key, pdf_bytes):
+        size = len(pdf_bytes)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = pdf_bytes
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                pdf_bytes = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return pdf_bytes
+
+    def _write_disk(self, key, pdf_bytes):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        # Write to a temp file first so concurrent readers never see a partial PDF
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # The disk tier is best effort; a full or read-only disk must not fail the render
+            logger.warning(f"Could not write PDF cache entry {key}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            if self._disk_size is not None:
+                self._disk_size += len(pdf_bytes)
+            due = (self._disk_size is None or self._disk_size > self.disk_max_bytes
+                   or time.monotonic() - self._last_disk_scan >= self.DISK_RESCAN_INTERVAL)
+        if due:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        """Delete the least recently used PDFs until the disk tier is below its budget."""
+        files = []
+        total = 0
+        for entry in os.scandir(self.disk_dir):
+            if not entry.name.endswith('.pdf'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        files.sort()
+        target = self.disk_max_bytes if total <= self.disk_max_bytes else self.disk_max_bytes * self.DISK_TRIM_RATIO
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # another worker evicted it first
+            total -= size
+            with self._lock:
+                self.evictions += 1
+        with self._lock:
+            self._disk_size = total
+            self._last_disk_scan = time.monotonic()
@@ -0,0 +1,141 @@
+"""Asynchronous PDF render jobs.
+
+Job state lives in small files under a shared directory so that any gunicorn
+worker can answer status and download requests for a job, not only the
+worker that accepted it.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its maximum depth."""
+
+
+class PdfJobQueue:
+    def __init__(self, job_dir, submit_render, max_queue, ttl_seconds, on_rendered=None):
+        self.job_dir = job_dir
+        self.max_queue = max_queue
+        self.ttl_seconds = ttl_seconds
+        self._submit_render = submit_render
+        self._on_rendered = on_rendered
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(job_dir, exist_ok=True)
+
+    def submit(self, fields, filename, cache_key, cached_pdf=None):
+        """Queue a render and return the new job id.
+
+        When the PDF is already known (`cached_pdf`), the job completes
+        immediately without taking a queue slot.
+        """
+        self.sweep_expired()
+        job_id = uuid.uuid4().hex
+        meta = {'job_id': job_id, 'filename': filename, 'cache_key': cache_key, 'created': time.time()}
+
+        if cached_pdf is not None:
+            self._finish(job_id, meta, cached_pdf)
+            return job_id
+
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise QueueFull()
+            self._pending += 1
+
+        self._write_meta(job_id, dict(meta, status='queued'))
+        try:
+            future = self._submit_render(fields)
+        except Exception as e:
+            self._release()
+            self._write_meta(job_id, dict(meta, status='failed', error=str(e)))
+            raise
+        future.add_done_callback(lambda f: self._on_done(job_id, meta, f))
+        return job_id
+
+    def status(self, job_id):
+        """Return the job's metadata dict, or None if it is unknown or expired."""
+        if not JOB_ID_RE.match(job_id):
+            return None
+        # Polling keeps sweeping even when no new jobs arrive
+        self.sweep_expired()
+        path = self._path(job_id, 'json')
+        try:
+            if os.stat(path).st_mtime < time.time() - self.ttl_seconds:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def artifact_path(self, job_id):
+        return self._path(job_id, 'pdf')
+
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def sweep_expired(self, min_interval=30):
+        """Delete job files older than the TTL, at most once per `min_interval` seconds."""
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < min_interval:
+                return
+            self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        for entry in os.scandir(self.job_dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _on_done(self, job_id, meta, future):
+        self._release()
+        # Exceptions raised in a done callback are swallowed, so anything failing here must mark the job failed
+        try:
+            pdf_bytes = future.result()
+            if self._on_rendered:
+                self._on_rendered(meta['cache_key'], pdf_bytes)
+            self._finish(job_id, meta, pdf_bytes)
+        except Exception as e:
+            logger.error(f"PDF job {job_id} failed: {e}")
+            try:
+                self._write_meta(job_id, dict(meta, status='failed', error=str(e)))
+            except OSError as write_error:
+                logger.error(f"Could not record the failure of PDF job {job_id}: {write_error}")
+
+    def _finish(self, job_id, meta, pdf_bytes):
+        self._write_atomic(self._path(job_id, 'pdf'), pdf_bytes)
+        self._write_meta(job_id, dict(meta, status='done', bytes=len(pdf_bytes)))
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    def _path(self, job_id, ext):
+        return os.path.join(self.job_dir, f"{job_id}.{ext}")
+
+    def _write_meta(self, job_id, meta):
+        self._write_atomic(self._path(job_id, 'json'), json.dumps(meta).encode('utf-8'))
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.job_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
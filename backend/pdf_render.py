@@ -0,0 +1,235 @@
+"""PDF rendering for resumes.
+
+Kept separate from the Flask app so batch render worker processes only need
+this module and its ReportLab stylesheet, not the web stack.
+"""
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.units import inch
+from reportlab.lib.pagesizes import letter
+from collections import OrderedDict
+import copy
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+
+import metrics
+
+# Define custom styles for the PDF
+styles = getSampleStyleSheet()
+styles.add(ParagraphStyle(name='Heading1Centered', parent=styles['h1'], alignment=TA_CENTER, fontSize=24, spaceAfter=14))
+styles.add(ParagraphStyle(name='SectionHeading', parent=styles['h2'], fontSize=16, spaceAfter=10, spaceBefore=12, leading=18))
+styles.add(ParagraphStyle(name='Subheading', parent=styles['h3'], fontSize=12, leading=14, spaceAfter=4, spaceBefore=4))
+styles.add(ParagraphStyle(name='DateLocation', parent=styles['Normal'], fontSize=9, alignment=TA_RIGHT, spaceAfter=0))
+styles.add(ParagraphStyle(name='ListItem', parent=styles['Normal'], fontSize=10, leading=12, leftIndent=0.2 * inch, bulletIndent=0.1 * inch, spaceAfter=3, bulletText='\u2022'))
+
+
+class SectionCache:
+    """LRU of built flowables per resume section, keyed by a hash of the section inputs.
+
+    Building a Paragraph runs ReportLab's markup parser, which dominates story
+    assembly on long resumes. Cached flowables are handed out as shallow copies:
+    wrap/split only set attributes on the copy, so the parsed fragments are
+    safely shared between documents.
+
+    Besides the entry count, the cache is bounded by `max_bytes` of estimated
+    memory: parsed paragraphs take up to about BYTES_PER_INPUT_CHAR bytes per
+    character of markup, so each entry is charged that much for its input.
+    """
+
+    BYTES_PER_INPUT_CHAR = 32
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (flowables, estimated bytes)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def get_or_build(self, section, inputs, style_names, build):
+        key = hashlib.sha256(json.dumps(
+            [section, inputs, [style_fingerprint(name) for name in style_names]]).encode('utf-8')).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits[section] = self._hits.get(section, 0) + 1
+            else:
+                self._misses[section] = self._misses.get(section, 0) + 1
+
+        if entry is None:
+            flowables = tuple(build())
+            size = sum(len(text) for text in inputs) * self.BYTES_PER_INPUT_CHAR
+            if self.max_entries > 0 and size <= self.max_bytes:
+                with self._lock:
+                    if key not in self._entries:
+                        self._entries[key] = (flowables, size)
+                        self._size += size
+                    while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                        _, (_, evicted_size) = self._entries.popitem(last=False)
+                        self._size -= evicted_size
+        else:
+            flowables = entry[0]
+        return [copy.copy(f) for f in flowables]
+
+    def stats(self):
+        with self._lock:
+            sections = {}
+            for section in set(self._hits) | set(self._misses):
+                hits = self._hits.get(section, 0)
+                misses = self._misses.get(section, 0)
+                sections[section] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses)}
+            hits = sum(self._hits.values())
+            lookups = hits + sum(self._misses.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'estimated_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': hits / lookups if lookups else 0.0,
+                'sections': sections,
+            }
+
+
+_style_fingerprints = {}
+
+def style_fingerprint(style_name):
+    """Hash of every resolved attribute of a stylesheet entry, so style edits invalidate cached sections."""
+    fingerprint = _style_fingerprints.get(style_name)
+    if fingerprint is None:
+        style = styles[style_name]
+        resolved = repr([(attr, getattr(style, attr)) for attr in sorted(style.defaults)])
+        fingerprint = _style_fingerprints[style_name] = hashlib.sha1(resolved.encode('utf-8')).hexdigest()
+    return fingerprint
+
+metrics.describe_histogram('resume_pdf_stage_seconds', "Time spent in each stage of PDF generation.")
+
+section_cache = SectionCache(max_entries=int(os.environ.get('PDF_SECTION_CACHE_SIZE', 512)),
+                             max_bytes=int(os.environ.get('PDF_SECTION_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+# Line sections at least this long are streamed into doc.build instead of being built and cached up front
+LAZY_SECTION_LINES = int(os.environ.get('PDF_LAZY_SECTION_LINES', 200))
+
+
+def build_header(name, email, phone, linkedin):
+    story = [Paragraph(name, styles['Heading1Centered'])]
+    contact_info_parts = [email]
+    if phone:
+        contact_info_parts.append(phone)
+    if linkedin:
+        contact_info_parts.append(f'<a href="{linkedin}" color="blue">{linkedin}</a>')
+
+    if contact_info_parts:
+        contact_line = ' | '.join(contact_info_parts)
+        story.append(Paragraph(contact_line, styles['Normal']))
+    story.append(Spacer(1, 0.1 * inch))
+    return story
+
+def build_text_section(title, text):
+    return [
+        Paragraph(title, styles['SectionHeading']),
+        Paragraph(text, styles['Normal']),
+        Spacer(1, 0.1 * inch),
+    ]
+
+def iter_lines(text):
+    """Yield the lines of `text` like text.split('\\n'), without building the whole list first."""
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def iter_lines_section(title, text, line_style):
+    yield Paragraph(title, styles['SectionHeading'])
+    for line in iter_lines(text):
+        if line.strip():
+            yield Paragraph(line.strip(), styles[line_style])
+    yield Spacer(1, 0.1 * inch)
+
+def build_lines_section(title, text, line_style):
+    return list(iter_lines_section(title, text, line_style))
+
+
+class LazyStory(list):
+    """Story list that pulls flowables from an iterator while doc.build consumes it.
+
+    doc.build pops flowables off the front and checks len() on every step, so
+    topping the buffer up there keeps only `lookahead` unbuilt flowables alive
+    at a time. The lookahead must cover keepWithNext chains, which ReportLab
+    looks for within the current len().
+    """
+
+    def __init__(self, flowables, lookahead=64):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def __len__(self):
+        if self._source is not None and list.__len__(self) < self._lookahead:
+            for flowable in self._source:
+                self.append(flowable)
+                if list.__len__(self) >= self._lookahead:
+                    break
+            else:
+                self._source = None
+        return list.__len__(self)
+
+
+def build_story(fields):
+    """Assemble the PDF story section by section, reusing cached sections whose inputs are unchanged.
+
+    Line sections longer than LAZY_SECTION_LINES are neither cached nor built
+    here; their flowables are generated one line at a time during doc.build.
+    Returns an iterable of flowables, meant to be wrapped in LazyStory.
+    """
+    story = section_cache.get_or_build(
+        'Header', [fields['name'], fields['email'], fields['phone'], fields['linkedin']],
+        ['Heading1Centered', 'Normal'],
+        lambda: build_header(fields['name'], fields['email'], fields['phone'], fields['linkedin']))
+    parts = [story]
+
+    for section, field, line_style in (('Summary', 'summary', None),
+                                       ('Skills', 'skills', None),
+                                       ('Education', 'education', 'Normal'),
+                                       ('Experience', 'experience', 'ListItem'),
+                                       ('References', 'reference', None)):
+        text = fields[field]
+        if not text:
+            continue
+        if line_style and text.count('\n') >= LAZY_SECTION_LINES:
+            parts.append(iter_lines_section(section, text, line_style))
+        elif line_style:
+            parts.append(section_cache.get_or_build(
+                section, [text], ['SectionHeading', line_style],
+                lambda: build_lines_section(section, text, line_style)))
+        else:
+            parts.append(section_cache.get_or_build(
+                section, [text], ['SectionHeading', 'Normal'],
+                lambda: build_text_section(section, text)))
+    return itertools.chain.from_iterable(parts)
+
+
+def render_resume_pdf_to(fields, out):
+    """Render normalized resume fields as a PDF into the binary file object `out`."""
+    doc = SimpleDocTemplate(out, pagesize=letter)
+    # Lazily generated sections are parsed inside doc.build and count towards the build stage
+    with metrics.timer('resume_pdf_stage_seconds', stage='story'):
+        story = LazyStory(build_story(fields))
+    with metrics.timer('resume_pdf_stage_seconds', stage='build'):
+        doc.build(story)
+
+
+def render_resume_pdf(fields):
+    """Render normalized resume fields to PDF bytes."""
+    buffer = io.BytesIO()
+    render_resume_pdf_to(fields, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,267 @@
+"""Benchmark the HTML and PDF render paths.
+
+Runs offline against Flask's test client, or against a local gunicorn it
+starts itself, and reports throughput, latency percentiles, peak RSS and
+response bytes for every route/template/corpus size. Results can be saved as
+a JSON baseline and later runs compared against it:
+
+    python benchmarks/bench.py --save benchmarks/baseline.json
+    python benchmarks/bench.py --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from corpus import SIZES, make_corpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, 'backend')
+
+# Each case is (route, template_style); PDF requests have no template
+CASES = (('resume', 'minimal'), ('resume', 'professional'), ('generate_resume_pdf', None))
+
+DEFAULT_REQUESTS = {'small': 200, 'typical': 100, 'pathological': 5}
+
+# Metrics compared against a baseline and whether larger values are worse
+COMPARED_METRICS = {'throughput_rps': False, 'p50_ms': True, 'p95_ms': True, 'p99_ms': True,
+                    'peak_rss_mb': True}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, wall_seconds, response_bytes, peak_rss_mb):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'throughput_rps': round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'peak_rss_mb': round(peak_rss_mb, 1) if peak_rss_mb is not None else None,
+        'bytes_per_request': int(sum(response_bytes) / len(response_bytes)) if response_bytes else 0,
+    }
+
+
+def self_peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class TestClientTarget:
+    name = 'testclient'
+    warmup_requests = 1
+
+    def __init__(self, args):
+        sys.path.insert(0, BACKEND)
+        from app import app
+        self.client = app.test_client()
+
+    def request(self, route, template_style, payload):
+        if route == 'resume':
+            response = self.client.post('/resume', data=dict(payload, template_style=template_style))
+        else:
+            response = self.client.post('/generate_resume_pdf', json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"/{route} returned {response.status_code}")
+        return len(response.data)
+
+    def peak_rss_mb(self):
+        return self_peak_rss_mb()
+
+    def close(self):
+        pass
+
+
+class GunicornTarget:
+    name = 'gunicorn'
+
+    def __init__(self, args):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.port = s.getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.warmup_requests = args.workers * 4
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--config', os.path.join(BACKEND, 'gunicorn.conf.py'),
+             '--chdir', BACKEND, '--workers', str(args.workers),
+             '--bind', f"127.0.0.1:{self.port}", '--log-level', 'warning', 'app:app'],
+            env=os.environ.copy())
+        self._wait_until_up()
+
+    def _wait_until_up(self, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("gunicorn exited during startup")
+            try:
+                urllib.request.urlopen(self.base_url + '/', timeout=1).read()
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+        raise RuntimeError("gunicorn did not start in time")
+
+    def request(self, route, template_style, payload):
+        if route == 'resume':
+            body = urllib.parse.urlencode(dict(payload, template_style=template_style)).encode('utf-8')
+            content_type = 'application/x-www-form-urlencoded'
+        else:
+            body = json.dumps(payload).encode('utf-8')
+            content_type = 'application/json'
+        req = urllib.request.Request(f"{self.base_url}/{route}", data=body,
+                                     headers={'Content-Type': content_type})
+        with urllib.request.urlopen(req, timeout=300) as response:
+            return len(response.read())
+
+    def peak_rss_mb(self):
+        """Sum of VmHWM over the gunicorn master and its workers (Linux only); this server only ran one case."""
+        pids = [self.process.pid]
+        try:
+            with open(f"/proc/{self.process.pid}/task/{self.process.pid}/children") as f:
+                pids += [int(pid) for pid in f.read().split()]
+            total_kb = 0
+            for pid in pids:
+                with open(f"/proc/{pid}/status") as f:
+                    for line in f:
+                        if line.startswith('VmHWM:'):
+                            total_kb += int(line.split()[1])
+            return total_kb / 1024
+        except OSError:
+            return None
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+TARGETS = {'testclient': TestClientTarget, 'gunicorn': GunicornTarget}
+
+
+def run_case(target, route, template_style, corpus, requests, concurrency):
+    # Untimed requests first so template compilation and imports are not measured. Each case gets a fresh
+    # server, so send several, one connection at a time, to reach every gunicorn worker and not only the first.
+    for _ in range(target.warmup_requests):
+        target.request(route, template_style, corpus[0])
+
+    def timed(i):
+        start = time.perf_counter()
+        size = target.request(route, template_style, corpus[i % len(corpus)])
+        return time.perf_counter() - start, size
+
+    wall_start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(requests)))
+    else:
+        results = [timed(i) for i in range(requests)]
+    wall = time.perf_counter() - wall_start
+    return summarize([r[0] for r in results], wall, [r[1] for r in results], target.peak_rss_mb())
+
+
+def run_case_in_fresh_process(target_name, args, route, template_style, size, requests, concurrency):
+    """Run one case against a target started for it alone.
+
+    Peak RSS (ru_maxrss, VmHWM) is a lifetime high-water mark, so a process
+    that already served earlier cases would report their peaks as well.
+    """
+    target = TARGETS[target_name](args)
+    try:
+        return run_case(target, route, template_style, make_corpus(size, 5), requests, concurrency)
+    finally:
+        target.close()
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human readable regressions beyond `threshold` (a fraction)."""
+    regressions = []
+    for case_id, current in results.items():
+        previous = baseline.get('results', {}).get(case_id)
+        if not previous:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change > threshold) if higher_is_worse else (change < -threshold):
+                regressions.append(f"{case_id} {metric}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=sorted(TARGETS) + ['all'], default='testclient')
+    parser.add_argument('--sizes', default=','.join(SIZES), help="comma separated corpus sizes")
+    parser.add_argument('--requests', type=int, help="requests per case (default depends on size)")
+    parser.add_argument('--concurrency', type=int, default=1, help="client threads (gunicorn target)")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--with-caches', action='store_true',
+                        help="keep the PDF caches enabled instead of measuring cold renders")
+    parser.add_argument('--save', help="write results as JSON to this path")
+    parser.add_argument('--baseline', help="JSON results from an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative change that counts as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    if not args.with_caches:
+        os.environ['PDF_CACHE_MAX_BYTES'] = '0'
+        os.environ['PDF_SECTION_CACHE_SIZE'] = '0'
+        os.environ.pop('PDF_CACHE_DIR', None)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    target_names = sorted(TARGETS) if args.target == 'all' else [args.target]
+    results = {}
+    # Spawned, not forked, so every case starts from a clean interpreter that has imported nothing
+    spawn = multiprocessing.get_context('spawn')
+    for target_name in target_names:
+        for size in sizes:
+            requests = args.requests or DEFAULT_REQUESTS[size]
+            for route, template_style in CASES:
+                case_id = '/'.join(filter(None, (target_name, route, template_style, size)))
+                concurrency = args.concurrency if target_name == 'gunicorn' else 1
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as runner:
+                    results[case_id] = runner.submit(run_case_in_fresh_process, target_name, args, route,
+                                                     template_style, size, requests, concurrency).result()
+                print(f"{case_id:55} {json.dumps(results[case_id])}", flush=True)
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'cpus': os.cpu_count(), 'with_caches': args.with_caches,
+                 'concurrency': args.concurrency, 'workers': args.workers,
+                 'created': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
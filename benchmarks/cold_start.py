@@ -0,0 +1,62 @@
+"""Measure cold start: module import time and time to the first responses.
+
+Each sample runs in a fresh interpreter:
+
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --backend /path/to/other/checkout/backend
+
+Reports the median of each timing. `import_s` is the time to import app.py;
+`first_*_s` is the time from interpreter start to the first response of that
+route, in the order index page, resume page, PDF.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r'''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+assert client.get('/').status_code == 200
+first_index = time.perf_counter()
+assert client.post('/resume', data={'name': 'A', 'education': 'x', 'experience': 'y'}).status_code == 200
+first_resume = time.perf_counter()
+assert client.post('/generate_resume_pdf', json={'name': 'A', 'experience': 'y'}).status_code == 200
+first_pdf = time.perf_counter()
+print(json.dumps({
+    'import_s': imported - start,
+    'first_index_s': first_index - start,
+    'first_resume_s': first_resume - start,
+    'first_pdf_s': first_pdf - start,
+}))
+'''
+
+
+def sample(backend, env):
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=backend, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default=os.path.join(ROOT, 'backend'))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PDF_CACHE_MAX_BYTES='0')
+    samples = [sample(args.backend, env) for _ in range(args.runs)]
+    summary = {key: round(statistics.median(s[key] for s in samples), 4)
+               for key in samples[0] if key.endswith('_s')}
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == '__main__':
+    main()
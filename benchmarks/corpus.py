@@ -0,0 +1,46 @@
+"""Synthetic resume payloads for the benchmarks.
+
+Payloads are generated from a seeded RNG so every run sees the same corpus.
+"""
+import random
+
+WORDS = ('design', 'build', 'lead', 'ship', 'scale', 'python', 'flask', 'api', 'data', 'team',
+         'customer', 'platform', 'migrate', 'optimize', 'service', 'latency', 'cloud', 'review',
+         'mentor', 'deliver', 'report', 'pipeline', 'release', 'quality', 'support', 'growth')
+
+# Line/character counts per corpus size. 'pathological' mirrors the worst inputs we have seen:
+# thousands of experience lines and a single very long skills string.
+SIZES = {
+    'small': {'summary_words': 20, 'skills': 5, 'education_lines': 1, 'experience_lines': 3},
+    'typical': {'summary_words': 80, 'skills': 30, 'education_lines': 4, 'experience_lines': 25},
+    'pathological': {'summary_words': 2000, 'skills': 3000, 'education_lines': 200, 'experience_lines': 5000},
+}
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_resume(size, seed=0):
+    """Return one resume payload (the fields posted by the form) of the given size."""
+    spec = SIZES[size]
+    rng = random.Random(f"{size}-{seed}")
+    first = rng.choice(('Ada', 'Grace', 'Linus', 'Thandi', 'Sipho', 'Maria', 'Wei'))
+    last = rng.choice(('Lovelace', 'Hopper', 'Mokoena', 'Nkosi', 'Garcia', 'Chen'))
+    return {
+        'name': f"{first} {last}",
+        'email': f"{first.lower()}.{last.lower()}{seed}@example.com",
+        'phone': f"+27 {rng.randint(10, 99)} {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        'linkedin': f"https://www.linkedin.com/in/{first.lower()}-{last.lower()}-{seed}",
+        'summary': _sentence(rng, spec['summary_words']),
+        'skills': ', '.join(rng.choice(WORDS) for _ in range(spec['skills'])),
+        'education': '\n'.join(f"BSc {rng.choice(WORDS).title()}, University {i}, {2000 + i % 20}"
+                               for i in range(spec['education_lines'])),
+        'experience': '\n'.join(_sentence(rng, rng.randint(6, 18)) for _ in range(spec['experience_lines'])),
+        'reference': 'Available upon request',
+    }
+
+
+def make_corpus(size, count):
+    """Return `count` distinct resumes of one size."""
+    return [make_resume(size, seed) for seed in range(count)]
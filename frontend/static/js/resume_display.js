@@ -49,6 +49,68 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
 
+    // The server tags each PDF with an ETag derived from the resume content.
+    // Browsers do not revalidate POST responses on their own, so keep the last
+    // PDF here and send its ETag back to skip rendering and the transfer.
+    let lastPdf = null; // { etag, blob, filename }
+
+    function savePdf(blob, filename) {
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.style.display = 'none';
+        a.href = url;
+        a.download = filename;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+    }
+
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+    function retryAfterMs(response, fallbackSeconds) {
+        const seconds = parseInt(response.headers.get('Retry-After'), 10);
+        return (Number.isNaN(seconds) ? fallbackSeconds : seconds) * 1000;
+    }
+
+    // Pages rendered from a saved draft only need to send its id, not the whole resume
+    const draftId = (typeof resumeDraftId !== 'undefined') ? resumeDraftId : null;
+
+    // Submits a render job, waits for it and returns the download response.
+    // Non-OK responses from any step are returned as-is for the caller to report.
+    async function fetchPdfViaJob(headers) {
+        let submitResponse;
+        while (true) {
+            submitResponse = await fetch('/pdf_jobs', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(draftId ? { draft_id: draftId } : resumeData),
+            });
+            if (submitResponse.status !== 429) {
+                break;
+            }
+            const waitMs = retryAfterMs(submitResponse, 2);
+            showPageMessage(`Server is busy, retrying in ${Math.ceil(waitMs / 1000)}s...`, 'info');
+            await sleep(waitMs);
+        }
+        if (!submitResponse.ok) {
+            return submitResponse;
+        }
+
+        let job = await submitResponse.json();
+        while (job.status === 'queued') {
+            await sleep(1000);
+            const statusResponse = await fetch(job.status_url);
+            if (!statusResponse.ok) {
+                return statusResponse;
+            }
+            job = await statusResponse.json();
+        }
+        if (job.status !== 'done') {
+            return new Response(JSON.stringify({ error: job.error || 'PDF generation failed.' }), { status: 500 });
+        }
+        return fetch(job.download_url, { headers: headers });
+    }
+
     if (downloadPdfBtn) {
         downloadPdfBtn.addEventListener('click', async () => {
             console.log('Download PDF button clicked!');
@@ -68,16 +130,30 @@ document.addEventListener('DOMContentLoaded', () => {
                 console.log('Sending fetch request with data:', resumeData);
                 // --- THIS IS THE CRITICAL CHANGE ---
                 // Changed from 'http://127.0.0.1:5000/generate_resume_pdf' to '/generate_resume_pdf'
-                const response = await fetch('/generate_resume_pdf', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify(resumeData),
-                });
+                const headers = {};
+                if (lastPdf) {
+                    headers['If-None-Match'] = lastPdf.etag;
+                }
+                let response;
+                if (typeof pdfJobsEnabled !== 'undefined' && pdfJobsEnabled) {
+                    response = await fetchPdfViaJob(headers);
+                } else if (draftId) {
+                    response = await fetch(`/drafts/${encodeURIComponent(draftId)}/pdf`, { headers: headers });
+                } else {
+                    headers['Content-Type'] = 'application/json';
+                    response = await fetch('/generate_resume_pdf', {
+                        method: 'POST',
+                        headers: headers,
+                        body: JSON.stringify(resumeData),
+                    });
+                }
                 console.log('Fetch response received:', response);
 
-                if (response.ok) {
+                if (response.status === 304 && lastPdf) {
+                    savePdf(lastPdf.blob, lastPdf.filename);
+                    showPageMessage('PDF download started!', 'success');
+                    console.log('PDF unchanged on the server, reused the previous download.');
+                } else if (response.ok) {
                     const contentDisposition = response.headers.get('Content-Disposition');
                     let filename = 'resume.pdf';
                     if (contentDisposition) {
@@ -88,14 +164,9 @@ document.addEventListener('DOMContentLoaded', () => {
                     }
 
                     const blob = await response.blob();
-                    const url = window.URL.createObjectURL(blob);
-                    const a = document.createElement('a');
-                    a.style.display = 'none';
-                    a.href = url;
-                    a.download = filename;
-                    document.body.appendChild(a);
-                    a.click();
-                    window.URL.revokeObjectURL(url);
+                    const etag = response.headers.get('ETag');
+                    lastPdf = etag ? { etag: etag, blob: blob, filename: filename } : null;
+                    savePdf(blob, filename);
                     showPageMessage('PDF download started!', 'success');
                     console.log('PDF download initiated successfully.');
                 } else {
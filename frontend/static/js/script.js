@@ -58,12 +58,59 @@ document.addEventListener('DOMContentLoaded', () => {
         return isValid;
     }
 
+    // When editing a saved draft, send only the fields that changed and open the draft's page.
+    // Returns false if the full form should be posted instead.
+    async function saveDraftChanges(draftInput) {
+        const changes = {};
+        resumeForm.querySelectorAll('input[type="text"], input[type="email"], input[type="url"], textarea').forEach(input => {
+            if (input.value !== input.defaultValue) {
+                changes[input.name] = input.value;
+            }
+        });
+        const templateInput = resumeForm.querySelector('input[name="template_style"]:checked');
+        const templateStyle = templateInput ? templateInput.value : 'minimal';
+        const draftId = encodeURIComponent(draftInput.value);
+
+        if (Object.keys(changes).length > 0) {
+            let response;
+            try {
+                response = await fetch(`/drafts/${draftId}`, {
+                    method: 'PATCH',
+                    headers: { 'Content-Type': 'application/json', 'If-Match': `"${draftInput.dataset.version}"` },
+                    body: JSON.stringify(changes),
+                });
+            } catch (error) {
+                return false;
+            }
+            if (response.status === 412) {
+                showMessage('This resume was changed somewhere else. Reload the page to see the latest version.', 'error');
+                return true;
+            }
+            if (!response.ok) {
+                return false;
+            }
+        }
+        window.location.href = `/drafts/${draftId}/resume?template_style=${encodeURIComponent(templateStyle)}`;
+        return true;
+    }
+
     // Add event listener for form submission
     if (resumeForm) {
-        resumeForm.addEventListener('submit', (event) => {
+        resumeForm.addEventListener('submit', async (event) => {
             // Only validate. If valid, the form proceeds to the action specified in HTML.
             if (!validateForm()) {
                 event.preventDefault(); // Stop form submission if validation fails
+                return;
+            }
+            const draftInput = document.getElementById('draft_id');
+            if (draftInput) {
+                event.preventDefault();
+                submitButton.disabled = true;
+                const handled = await saveDraftChanges(draftInput);
+                submitButton.disabled = false;
+                if (!handled) {
+                    resumeForm.submit(); // The server updates the same draft from the full form
+                }
             }
         });
 